@@ -379,10 +379,11 @@ def dedupe(sequence):
         stable de-duplication of the sequence
     """
     seen = set()
+    seen_add = seen.add
     for x in sequence:
         if x not in seen:
+            seen_add(x)
             yield x
-            seen.add(x)
 
 
 class RequiredAttributeError(ValueError):
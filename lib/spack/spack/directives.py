@@ -48,11 +48,16 @@ The available directives are:
 
 import collections
 import functools
-import inspect
+import itertools
 import os.path
 import re
 from six import string_types
 
+try:
+    from collections.abc import Sequence
+except ImportError:
+    from collections import Sequence
+
 import llnl.util.lang
 import spack
 import spack.error
@@ -68,6 +73,88 @@ from spack.version import Version
 
 __all__ = []
 
+#: Compiled regex used to validate the names of variants
+_identifier_re = re.compile(spack.spec.identifier_re)
+
+#: Allowed values of a boolean variant
+_boolean_values = (True, False)
+
+#: Strings accepted as the default of a boolean variant
+_boolean_strings = frozenset(
+    ('true', 'True', 'TRUE', 'false', 'False', 'FALSE'))
+
+
+def _any_value(x):
+    """Single value validator shared by all the variants that accept
+    any value."""
+    return True
+
+
+#: The default deptype is build and link because the common case is to
+#: build against a library which then turns into a runtime dependency
+#: due to the linker.
+#: XXX(deptype): Add 'run' to this? It's an uncommon dependency type,
+#:               but is most backwards-compatible.
+_default_deptype = spack.spec.canonical_deptype(('build', 'link'))
+
+#: Cache of the anonymous specs parsed from directive conditions, keyed
+#: on the (condition string, package name) pair.
+_when_spec_cache = {}
+
+#: Comparison keys of the specs in ``_when_spec_cache``, with the same keys
+_when_spec_cmp_keys = {}
+
+
+def _parse_when_spec(condition, pkg_name, dict_key=False):
+    """Returns the anonymous spec for a directive condition.
+
+    The same condition strings (e.g. ``'+mpi'``) recur across directives
+    and packages, so string conditions are parsed only once. Callers get
+    a fresh copy of the cached spec, which they are free to modify.
+
+    If ``dict_key`` is True the copy also carries the comparison key of
+    the cached spec, so that hashing it doesn't walk the spec again. That
+    key is never updated: pass ``dict_key=True`` only for specs that are
+    used as dictionary keys and are not modified afterwards.
+    """
+    if not isinstance(condition, string_types):
+        return parse_anonymous_spec(condition, pkg_name)
+
+    key = (condition, pkg_name)
+    when_spec = _when_spec_cache.get(key)
+    if when_spec is None:
+        when_spec = parse_anonymous_spec(condition, pkg_name)
+        _when_spec_cache[key] = when_spec
+        _when_spec_cmp_keys[key] = when_spec._cmp_key()
+
+    when_spec = when_spec.copy()
+    if dict_key:
+        when_spec._cmp_key_cache = _when_spec_cmp_keys[key]
+    return when_spec
+
+
+#: Cache of the specs parsed from the string literals passed to
+#: ``depends_on`` and ``extends``, keyed on the literal itself.
+_dependency_spec_cache = {}
+
+
+def _parse_dependency_spec(spec):
+    """Returns a new Spec for the argument of a dependency directive.
+
+    Literals like ``'mpi'`` or ``'blas'`` are shared by many packages, so
+    they are parsed once and copied afterwards. Literals that refer to
+    installed specs by hash are always parsed, as their meaning depends on
+    the contents of the database.
+    """
+    if not isinstance(spec, string_types) or '/' in spec:
+        return Spec(spec)
+
+    dep_spec = _dependency_spec_cache.get(spec)
+    if dep_spec is None:
+        dep_spec = Spec(spec)
+        _dependency_spec_cache[spec] = dep_spec
+    return dep_spec.copy()
+
 
 class DirectiveMetaMixin(type):
     """Flushes the directives that were temporarily stored in the staging
@@ -78,37 +165,38 @@ class DirectiveMetaMixin(type):
     _directive_names = set()
     _directives_to_be_executed = []
 
+    # Dictionaries whose values are containers, mapped to the type of the
+    # containers (see the ``container`` argument of ``directive``)
+    _directive_containers = {}
+
     def __new__(mcs, name, bases, attr_dict):
         # Initialize the attribute containing the list of directives
         # to be executed. Here we go reversed because we want to execute
         # commands:
         # 1. in the order they were defined
         # 2. following the MRO
-        attr_dict['_directives_to_be_executed'] = []
-        for base in reversed(bases):
-            try:
-                directive_from_base = base._directives_to_be_executed
-                attr_dict['_directives_to_be_executed'].extend(
-                    directive_from_base
-                )
-            except AttributeError:
-                # The base class didn't have the required attribute.
-                # Continue searching
-                pass
-        # De-duplicates directives from base classes
-        attr_dict['_directives_to_be_executed'] = [
-            x for x in llnl.util.lang.dedupe(
-                attr_dict['_directives_to_be_executed']
+        # Bases that don't have the attribute are simply skipped, and
+        # directives inherited from more than one base are de-duplicated.
+        if len(bases) == 1:
+            # Single inheritance is by far the most common case: the list
+            # of the base class has no duplicates, so it's enough to copy it
+            directives = list(
+                getattr(bases[0], '_directives_to_be_executed', ())
+            )
+        else:
+            directives_from_bases = itertools.chain.from_iterable(
+                getattr(base, '_directives_to_be_executed', ())
+                for base in reversed(bases)
             )
-        ]
+            directives = list(llnl.util.lang.dedupe(directives_from_bases))
 
         # Move things to be executed from module scope (where they
         # are collected first) to class scope
-        if DirectiveMetaMixin._directives_to_be_executed:
-            attr_dict['_directives_to_be_executed'].extend(
-                DirectiveMetaMixin._directives_to_be_executed
-            )
+        pending = DirectiveMetaMixin._directives_to_be_executed
+        if pending:
+            directives.extend(pending)
             DirectiveMetaMixin._directives_to_be_executed = []
+        attr_dict['_directives_to_be_executed'] = directives
 
         return super(DirectiveMetaMixin, mcs).__new__(
             mcs, name, bases, attr_dict
@@ -117,16 +205,26 @@ class DirectiveMetaMixin(type):
     def __init__(cls, name, bases, attr_dict):
         # The class is being created: if it is a package we must ensure
         # that the directives are called on the class to set it up
-        module = inspect.getmodule(cls)
-        if 'spack.pkg' in module.__name__:
+        # The name of the defining module is enough to tell packages
+        # apart, so there's no need to look up the module object itself
+        module_name = cls.__module__
+        if module_name.startswith('spack.pkg.'):
             # Package name as taken
             # from llnl.util.lang.get_calling_module_name
-            pkg_name = module.__name__.split('.')[-1]
+            pkg_name = module_name.split('.')[-1]
             setattr(cls, 'name', pkg_name)
             # Ensure the presence of the dictionaries associated
             # with the directives
+            # Dictionaries of containers are defaultdicts. Note that this
+            # means reading a missing key inserts it: code using them
+            # outside of directives (e.g. ``if not self.patches`` in
+            # package.py) relies on only iterating over them.
+            containers = DirectiveMetaMixin._directive_containers
             for d in DirectiveMetaMixin._directive_names:
-                setattr(cls, d, {})
+                if d in containers:
+                    setattr(cls, d, collections.defaultdict(containers[d]))
+                else:
+                    setattr(cls, d, {})
             # Lazy execution of directives
             for command in cls._directives_to_be_executed:
                 command(cls)
@@ -134,7 +232,7 @@ class DirectiveMetaMixin(type):
         super(DirectiveMetaMixin, cls).__init__(name, bases, attr_dict)
 
     @staticmethod
-    def directive(dicts=None):
+    def directive(dicts=None, container=None):
         """Decorator for Spack directives.
 
         Spack directives allow you to modify a package while it is being
@@ -172,16 +270,28 @@ class DirectiveMetaMixin(type):
         Package class, and it's how Spack gets information from the
         packages to the core.
 
+        If the values of the dictionaries are containers, their type can
+        be passed as ``container``, e.g.:
+
+            @directive(dicts='patches', container=list)
+
+        The dictionaries are then created as ``collections.defaultdict``
+        of that type, so the directive can simply do
+        ``pkg.patches[when_spec].append(...)``.
+
         """
         global __all__
 
         if isinstance(dicts, string_types):
             dicts = (dicts, )
-        if not isinstance(dicts, collections.Sequence):
+        if not isinstance(dicts, Sequence):
             message = "dicts arg must be list, tuple, or string. Found {0}"
             raise TypeError(message.format(type(dicts)))
         # Add the dictionary names if not already there
         DirectiveMetaMixin._directive_names |= set(dicts)
+        if container is not None:
+            for d in dicts:
+                DirectiveMetaMixin._directive_containers[d] = container
 
         # This decorator just returns the directive functions
         def _decorator(decorated_function):
@@ -193,8 +303,10 @@ class DirectiveMetaMixin(type):
                 # package or a sequence of them
                 values = decorated_function(*args, **kwargs)
 
-                # ...so if it is not a sequence make it so
-                if not isinstance(values, collections.Sequence):
+                # ...so if it is not a sequence make it so. Directives only
+                # ever return tuples or lists, and checking the concrete
+                # type is much cheaper than an isinstance check on an ABC
+                if type(values) not in (tuple, list):
                     values = (values, )
 
                 DirectiveMetaMixin._directives_to_be_executed.extend(values)
@@ -231,29 +343,26 @@ def _depends_on(pkg, spec, when=None, type=None):
     # If when is None or True make sure the condition is always satisfied
     if when is None or when is True:
         when = pkg.name
-    when_spec = parse_anonymous_spec(when, pkg.name)
+    when_spec = _parse_when_spec(when, pkg.name, dict_key=True)
 
     if type is None:
-        # The default deptype is build and link because the common case is to
-        # build against a library which then turns into a runtime dependency
-        # due to the linker.
-        # XXX(deptype): Add 'run' to this? It's an uncommon dependency type,
-        #               but is most backwards-compatible.
-        type = ('build', 'link')
-
-    type = spack.spec.canonical_deptype(type)
-
-    for deptype in type:
-        if deptype not in spack.spec.alldeps:
-            raise UnknownDependencyTypeError('depends_on', pkg.name, deptype)
-
-    dep_spec = Spec(spec)
+        # The default is already canonical, so it needs no validation
+        type = _default_deptype
+    else:
+        try:
+            type = spack.spec.canonical_deptype(type)
+        except ValueError:
+            if not isinstance(type, (tuple, list, set, frozenset)):
+                type = (type,)
+            invalid = next(d for d in type if d not in spack.spec.alldeps)
+            raise UnknownDependencyTypeError('depends_on', pkg.name, invalid)
+
+    dep_spec = _parse_dependency_spec(spec)
     if pkg.name == dep_spec.name:
         raise CircularReferenceError('depends_on', pkg.name)
 
     pkg_deptypes = pkg.dependency_types.setdefault(dep_spec.name, set())
-    for deptype in type:
-        pkg_deptypes.add(deptype)
+    pkg_deptypes.update(type)
 
     conditions = pkg.dependencies.setdefault(dep_spec.name, {})
     if when_spec in conditions:
@@ -262,7 +371,7 @@ def _depends_on(pkg, spec, when=None, type=None):
         conditions[when_spec] = dep_spec
 
 
-@directive('conflicts')
+@directive('conflicts', container=list)
 def conflicts(conflict_spec, when=None, msg=None):
     """Allows a package to define a conflict.
 
@@ -285,11 +394,10 @@ def conflicts(conflict_spec, when=None, msg=None):
     def _execute(pkg):
         # If when is not specified the conflict always holds
         condition = pkg.name if when is None else when
-        when_spec = parse_anonymous_spec(condition, pkg.name)
+        when_spec = _parse_when_spec(condition, pkg.name)
 
         # Save in a list the conflicts and the associated custom messages
-        when_spec_list = pkg.conflicts.setdefault(conflict_spec, [])
-        when_spec_list.append((when_spec, msg))
+        pkg.conflicts[conflict_spec].append((when_spec, msg))
     return _execute
 
 
@@ -299,9 +407,9 @@ def depends_on(spec, when=None, type=None):
     This directive is to be used inside a Package definition to declare
     that the package requires other packages to be built first.
     @see The section "Dependency specs" in the Spack Packaging Guide."""
-    def _execute(pkg):
-        _depends_on(pkg, spec, when=when, type=type)
-    return _execute
+    # Bind the arguments directly to _depends_on: this is the most used
+    # directive, and a partial saves a Python frame per call
+    return functools.partial(_depends_on, spec=spec, when=when, type=type)
 
 
 @directive(('extendees', 'dependencies', 'dependency_types'))
@@ -327,11 +435,11 @@ def extends(spec, **kwargs):
 
         when = kwargs.pop('when', pkg.name)
         _depends_on(pkg, spec, when=when)
-        pkg.extendees[spec] = (Spec(spec), kwargs)
+        pkg.extendees[spec] = (_parse_dependency_spec(spec), kwargs)
     return _execute
 
 
-@directive('provided')
+@directive('provided', container=set)
 def provides(*specs, **kwargs):
     """Allows packages to provide a virtual dependency.  If a package provides
        'mpi', other packages can declare that they depend on "mpi", and spack
@@ -339,19 +447,17 @@ def provides(*specs, **kwargs):
     """
     def _execute(pkg):
         spec_string = kwargs.get('when', pkg.name)
-        provider_spec = parse_anonymous_spec(spec_string, pkg.name)
+        provider_spec = _parse_when_spec(spec_string, pkg.name)
 
         for string in specs:
             for provided_spec in spack.spec.parse(string):
                 if pkg.name == provided_spec.name:
                     raise CircularReferenceError('depends_on', pkg.name)
-                if provided_spec not in pkg.provided:
-                    pkg.provided[provided_spec] = set()
                 pkg.provided[provided_spec].add(provider_spec)
     return _execute
 
 
-@directive('patches')
+@directive('patches', container=list)
 def patch(url_or_filename, level=1, when=None, **kwargs):
     """Packages can declare patches to apply to source.  You can
     optionally provide a when spec to indicate that a particular
@@ -371,11 +477,42 @@ def patch(url_or_filename, level=1, when=None, **kwargs):
     """
     def _execute(pkg):
         constraint = pkg.name if when is None else when
-        when_spec = parse_anonymous_spec(constraint, pkg.name)
-        cur_patches = pkg.patches.setdefault(when_spec, [])
+        when_spec = _parse_when_spec(constraint, pkg.name, dict_key=True)
         # if this spec is identical to some other, then append this
         # patch to the existing list.
-        cur_patches.append(Patch.create(pkg, url_or_filename, level, **kwargs))
+        pkg.patches[when_spec].append(
+            Patch.create(pkg, url_or_filename, level, **kwargs))
+    return _execute
+
+
+def _variant(name, default=None, description='', values=None, multi=False,
+             validator=None):
+    """Returns the function that adds a variant to a package. The
+    arguments are the same as those of the ``variant`` directive.
+    """
+    if values is None:
+        if default in (True, False) or (type(default) is str and
+                                        default in _boolean_strings):
+            values = _boolean_values
+        else:
+            values = _any_value
+
+    if default is None:
+        default = False if values == _boolean_values else ''
+
+    # Normalize once here: the closure below runs again for every
+    # package class that inherits the variant
+    description = str(description).strip()
+
+    def _execute(pkg):
+        if not _identifier_re.match(name):
+            directive = 'variant'
+            msg = "Invalid variant name in {0}: '{1}'"
+            raise DirectiveError(directive, msg.format(pkg.name, name))
+
+        pkg.variants[name] = Variant(
+            name, default, description, values, multi, validator
+        )
     return _execute
 
 
@@ -406,32 +543,26 @@ def variant(
             logic. It receives a tuple of values and should raise an instance
             of SpackError if the group doesn't meet the additional constraints
     """
-    if values is None:
-        if default in (True, False) or (type(default) is str and
-                                        default.upper() in ('TRUE', 'FALSE')):
-            values = (True, False)
-        else:
-            values = lambda x: True
+    return _variant(name, default, description, values, multi, validator)
 
-    if default is None:
-        default = False if values == (True, False) else ''
 
-    default = default
-    description = str(description).strip()
+@directive('variants')
+def variants_bulk(specs):
+    """Define many variants for the package at once. This is equivalent
+    to calling ``variant`` once per element of ``specs``, and is meant for
+    packages that declare a lot of similar variants in a loop::
 
-    def _execute(pkg):
-        if not re.match(spack.spec.identifier_re, name):
-            directive = 'variant'
-            msg = "Invalid variant name in {0}: '{1}'"
-            raise DirectiveError(directive, msg.format(pkg.name, name))
+        variants_bulk([(pkg, False, 'Activate {0}'.format(pkg))
+                       for pkg in supported_packages])
 
-        pkg.variants[name] = Variant(
-            name, default, description, values, multi, validator
-        )
-    return _execute
+    Args:
+        specs (list): sequence of tuples, each containing the arguments
+            of a ``variant`` directive in positional order
+    """
+    return [_variant(*args) for args in specs]
 
 
-@directive('resources')
+@directive('resources', container=list)
 def resource(**kwargs):
     """Define an external resource to be fetched and staged when building the
     package. Based on the keywords present in the dictionary the appropriate
@@ -472,11 +603,11 @@ def resource(**kwargs):
             message += "\tdestination : '{dest}'\n".format(dest=destination)
             raise RuntimeError(message)
 
-        when_spec = parse_anonymous_spec(when, pkg.name)
-        resources = pkg.resources.setdefault(when_spec, [])
+        when_spec = _parse_when_spec(when, pkg.name, dict_key=True)
         name = kwargs.get('name')
         fetcher = from_kwargs(**kwargs)
-        resources.append(Resource(name, fetcher, destination, placement))
+        pkg.resources[when_spec].append(
+            Resource(name, fetcher, destination, placement))
     return _execute
 
 
@@ -202,23 +202,68 @@ alldeps = ('build', 'link', 'run')
 #: Max integer helps avoid passing too large a value to cyaml.
 maxint = 2 ** (ctypes.sizeof(ctypes.c_int) * 8 - 1) - 1
 
+#: Set of valid dependency types, for fast membership tests.
+_alldeps_set = frozenset(alldeps)
 
-def canonical_deptype(deptype):
+#: Canonical (sorted) tuples for every combination of dependency types.
+#: Results of ``canonical_deptype`` are interned through this dict so
+#: that equal deptypes share the same tuple object.
+_canonical_deptypes = dict(
+    (c, c) for n in range(len(alldeps) + 1)
+    for c in itertools.combinations(alldeps, n))
+
+
+@memoized
+def _canonical_deptype(deptype):
     if deptype in (None, 'all', all):
         return alldeps
 
     elif isinstance(deptype, string_types):
-        if deptype not in alldeps:
+        if deptype not in _alldeps_set:
             raise ValueError('Invalid dependency type: %s' % deptype)
-        return (deptype,)
+        return _canonical_deptypes[(deptype,)]
+
+    # Anything else is a tuple: see canonical_deptype
+    if not _alldeps_set.issuperset(deptype):
+        invalid = next(d for d in deptype if d not in _alldeps_set)
+        raise ValueError('Invalid dependency type: %s' % invalid)
+    deptype = tuple(sorted(deptype))
+    return _canonical_deptypes.get(deptype, deptype)
+
 
-    elif isinstance(deptype, (tuple, list)):
-        invalid = next((d for d in deptype if d not in alldeps), None)
-        if invalid:
-            raise ValueError('Invalid dependency type: %s' % invalid)
-        return tuple(sorted(deptype))
+def canonical_deptype(deptype):
+    """Convert deptype to a canonical sorted tuple, or raise ValueError.
 
-    return deptype
+    Args:
+        deptype (str or list or tuple or set): string representing
+            dependency type, or a list/tuple/set of such strings.  Can
+            also be the builtin function ``all`` or the string 'all',
+            which result in a tuple of all dependency types known to Spack.
+    """
+    # Lists and sets are not hashable: turn them into tuples before
+    # hitting the cache
+    if isinstance(deptype, (list, set, frozenset)):
+        deptype = tuple(deptype)
+    elif not (deptype is None or deptype is all or
+              isinstance(deptype, (tuple, string_types))):
+        raise ValueError('Invalid dependency type: %s' % (deptype,))
+
+    try:
+        return _canonical_deptype(deptype)
+    except TypeError:
+        # Unhashable elements break the cache lookup, but they can't be
+        # valid dependency types anyway
+        invalid = next(d for d in deptype if d not in alldeps)
+        raise ValueError('Invalid dependency type: %s' % (invalid,))
+
+
+def _interned_deptypes(deptypes):
+    """Returns the sorted tuple of unique ``deptypes``. Equal results
+    share the same tuple object, so the many DependencySpecs in a DAG
+    don't each hold their own copy.
+    """
+    deptypes = tuple(sorted(set(deptypes)))
+    return _canonical_deptypes.get(deptypes, deptypes)
 
 
 def colorize_spec(spec):
@@ -563,15 +608,18 @@ class DependencySpec(object):
     - deptypes: list of strings, representing dependency relationships.
     """
 
+    # There is one DependencySpec per edge of every DAG in memory, so
+    # don't give each of them its own __dict__
+    __slots__ = ('parent', 'spec', 'deptypes')
+
     def __init__(self, parent, spec, deptypes):
         self.parent = parent
         self.spec = spec
-        self.deptypes = tuple(sorted(set(deptypes)))
+        self.deptypes = _interned_deptypes(deptypes)
 
     def update_deptypes(self, deptypes):
-        deptypes = set(deptypes)
-        deptypes.update(self.deptypes)
-        deptypes = tuple(sorted(deptypes))
+        deptypes = _interned_deptypes(
+            itertools.chain(deptypes, self.deptypes))
         changed = self.deptypes != deptypes
 
         self.deptypes = deptypes
@@ -2537,8 +2585,10 @@ class Spec(object):
         if caches is None:
             caches = (deps is True or deps == alldeps)
 
-        # If we copy dependencies, preserve DAG structure in the new spec
-        if deps:
+        # If we copy dependencies, preserve DAG structure in the new spec.
+        # Nodes without dependencies, like most of the specs created by
+        # package directives, don't need to traverse anything.
+        if deps and other._dependencies:
             # If caller restricted deptypes to be copied, adjust that here.
             # By default, just copy all deptypes
             deptypes = deps if isinstance(deps, (tuple, list)) else alldeps
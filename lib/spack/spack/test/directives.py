@@ -0,0 +1,167 @@
+##############################################################################
+# Copyright (c) 2013-2017, Lawrence Livermore National Security, LLC.
+# Produced at the Lawrence Livermore National Laboratory.
+#
+# This file is part of Spack.
+# Created by Todd Gamblin, tgamblin@llnl.gov, All rights reserved.
+# LLNL-CODE-647188
+#
+# For details, see https://github.com/llnl/spack
+# Please also see the NOTICE and LICENSE files for our notice and the LGPL.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License (as
+# published by the Free Software Foundation) version 2.1, February 1999.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the IMPLIED WARRANTY OF
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the terms and
+# conditions of the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+##############################################################################
+import pytest
+
+import spack
+import spack.directives
+from spack.directives import DirectiveError, UnknownDependencyTypeError
+from spack.spec import Spec, parse_anonymous_spec
+
+
+def test_when_spec_cache_returns_copies():
+    key = ('+mpi', 'mpileaks')
+    expected = parse_anonymous_spec(*key)
+
+    # Modifying a spec returned by the cache...
+    first = spack.directives._parse_when_spec(*key)
+    first.constrain(Spec('mpileaks@2.3'))
+    assert first != expected
+
+    # ...must not affect the next callers
+    second = spack.directives._parse_when_spec(*key)
+    assert second is not first
+    assert second == expected
+    assert str(second) == str(expected)
+    assert spack.directives._when_spec_cache[key] == expected
+
+
+def test_when_spec_cache_comparison_keys():
+    key = ('@1.0:', 'mpileaks')
+    expected = parse_anonymous_spec(*key)
+
+    # Copies are compared on their current content after being modified
+    modified = spack.directives._parse_when_spec(*key)
+    modified.constrain(Spec('mpileaks+debug'))
+    assert modified != expected
+    assert modified == Spec('mpileaks@1.0:+debug')
+    assert hash(modified) == hash(Spec('mpileaks@1.0:+debug'))
+
+    # Specs requested as dictionary keys carry the precomputed key of the
+    # cached spec, which is still correct
+    dict_key = spack.directives._parse_when_spec(*key, dict_key=True)
+    assert dict_key == expected
+    assert hash(dict_key) == hash(expected)
+    assert {expected: 'found'}[dict_key] == 'found'
+    assert spack.directives._when_spec_cache[key] == expected
+
+
+def test_when_spec_cache_is_bypassed_by_specs():
+    condition = parse_anonymous_spec('+debug', 'mpileaks')
+    cache_size = len(spack.directives._when_spec_cache)
+
+    when_spec = spack.directives._parse_when_spec(condition, 'mpileaks')
+    assert when_spec == condition
+    assert when_spec is not condition
+    assert len(spack.directives._when_spec_cache) == cache_size
+
+
+@pytest.mark.usefixtures('config', 'builtin_mock')
+def test_dependency_spec_cache_returns_copies():
+    # Both packages start from the same 'mpi' literal, then constrain
+    # their dependency spec in place in different ways
+    pkg_a = spack.repo.get('cached-literal-a')
+    pkg_b = spack.repo.get('cached-literal-b')
+
+    mpi_a, = pkg_a.dependencies['mpi'].values()
+    mpi_b, = pkg_b.dependencies['mpi'].values()
+    assert mpi_a is not mpi_b
+    assert mpi_a.versions == Spec('mpi@2:').versions
+    assert mpi_b.versions == Spec('mpi@:1').versions
+
+    # The cached spec is left untouched
+    assert spack.directives._dependency_spec_cache['mpi'] == Spec('mpi')
+
+
+def test_dependency_spec_cache_skips_hashes(monkeypatch):
+    parsed = []
+
+    def mock_spec(spec_like):
+        parsed.append(spec_like)
+        return Spec('mpileaks')
+    monkeypatch.setattr(spack.directives, 'Spec', mock_spec)
+
+    # Literals referring to a hash are parsed every time, and never cached
+    literal = 'mpileaks ^/abcdef'
+    spack.directives._parse_dependency_spec(literal)
+    spack.directives._parse_dependency_spec(literal)
+    assert parsed == [literal, literal]
+    assert literal not in spack.directives._dependency_spec_cache
+
+
+@pytest.mark.usefixtures('config', 'builtin_mock')
+def test_variants_bulk():
+    bulk = spack.repo.get('variants-bulk').variants
+    single = spack.repo.get('variants-single').variants
+
+    assert sorted(bulk) == sorted(single)
+    for name, variant in bulk.items():
+        expected = single[name]
+        assert variant.default == expected.default
+        assert variant.description == expected.description
+        assert variant.values == expected.values
+        assert variant.multi == expected.multi
+
+    assert bulk['foo'].default is False
+    assert bulk['foo'].description == 'Activate foo'
+    assert bulk['bar'].values == (True, False)
+    assert bulk['qux'].default == ''
+    assert bulk['qux'].values is None
+    assert (bulk['qux'].single_value_validator is
+            single['qux'].single_value_validator)
+
+
+def test_variants_bulk_invalid_name():
+    spack.directives.variants_bulk(
+        [('valid', False, 'Valid name'), ('-bad', False, 'Bad name')]
+    )
+    # Take the directives out of the staging area, so that they are
+    # not attached to the next package class being defined
+    staged = spack.directives.DirectiveMetaMixin._directives_to_be_executed
+    add_valid, add_invalid = staged[-2:]
+    del staged[-2:]
+
+    class MockPackage(object):
+        name = 'mock-package'
+        variants = {}
+
+    add_valid(MockPackage)
+    assert 'valid' in MockPackage.variants
+
+    with pytest.raises(DirectiveError):
+        add_invalid(MockPackage)
+
+
+@pytest.mark.parametrize('deptype', [
+    'foo', ('build', 'foo'), ['all'], ('build', ['link']), 3
+])
+def test_depends_on_unknown_deptype(deptype):
+    class MockPackage(object):
+        name = 'mock-package'
+        dependencies = {}
+        dependency_types = {}
+
+    with pytest.raises(UnknownDependencyTypeError):
+        spack.directives._depends_on(MockPackage, 'mpi', type=deptype)
+    assert not MockPackage.dependencies
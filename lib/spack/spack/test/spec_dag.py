@@ -827,6 +827,11 @@ class TestSpecDag(object):
         assert canonical_deptype(
             ['build', 'run']) == ('build', 'run')
 
+        # sets
+        assert canonical_deptype(set(['build'])) == ('build',)
+        assert canonical_deptype(
+            frozenset(['run', 'build'])) == ('build', 'run')
+
         # sorting
         assert canonical_deptype(
             ('run', 'build', 'link')) == ('build', 'link', 'run')
@@ -837,11 +842,22 @@ class TestSpecDag(object):
         assert canonical_deptype(
             ('link', 'build')) == ('build', 'link')
 
+        # equal deptypes share the same canonical tuple
+        assert canonical_deptype(
+            ['link', 'build']) is canonical_deptype(('build', 'link'))
+        assert canonical_deptype('run') is canonical_deptype(['run'])
+
         # can't put 'all' in tuple or list
         with pytest.raises(ValueError):
             canonical_deptype(['all'])
         with pytest.raises(ValueError):
             canonical_deptype(('all',))
+        with pytest.raises(ValueError):
+            canonical_deptype(set(['all']))
+        with pytest.raises(ValueError):
+            canonical_deptype({'build': True})
+        with pytest.raises(ValueError):
+            canonical_deptype(('build', ['link']))
 
         # invalid values
         with pytest.raises(ValueError):
@@ -0,0 +1,47 @@
+##############################################################################
+# Copyright (c) 2013-2017, Lawrence Livermore National Security, LLC.
+# Produced at the Lawrence Livermore National Laboratory.
+#
+# This file is part of Spack.
+# Created by Todd Gamblin, tgamblin@llnl.gov, All rights reserved.
+# LLNL-CODE-647188
+#
+# For details, see https://github.com/llnl/spack
+# Please also see the NOTICE and LICENSE files for our notice and the LGPL.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License (as
+# published by the Free Software Foundation) version 2.1, February 1999.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the IMPLIED WARRANTY OF
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the terms and
+# conditions of the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+##############################################################################
+from spack import *
+
+
+class VariantsBulk(Package):
+    """Package that declares its variants with variants_bulk. Must end
+    up with the same variants as variants-single.
+    """
+
+    homepage = "http://www.example.com"
+    url = "http://www.example.com/variants-bulk-1.0.tar.gz"
+
+    version('1.0', '0123456789abcdef0123456789abcdef')
+
+    variants_bulk([
+        ('foo', False, '  Activate foo  '),
+        ('bar', 'true', 'Activate bar'),
+        ('baz', 'a', 'Choose baz', ('a', 'b', 'c')),
+        ('qux', None, 'Any value for qux'),
+        ('fee', 'a,b', 'Choose many fee', ('a', 'b', 'c'), True),
+    ])
+
+    def install(self, spec, prefix):
+        pass
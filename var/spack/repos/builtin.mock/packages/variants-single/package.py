@@ -0,0 +1,47 @@
+##############################################################################
+# Copyright (c) 2013-2017, Lawrence Livermore National Security, LLC.
+# Produced at the Lawrence Livermore National Laboratory.
+#
+# This file is part of Spack.
+# Created by Todd Gamblin, tgamblin@llnl.gov, All rights reserved.
+# LLNL-CODE-647188
+#
+# For details, see https://github.com/llnl/spack
+# Please also see the NOTICE and LICENSE files for our notice and the LGPL.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License (as
+# published by the Free Software Foundation) version 2.1, February 1999.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the IMPLIED WARRANTY OF
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the terms and
+# conditions of the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+##############################################################################
+from spack import *
+
+
+class VariantsSingle(Package):
+    """Package that declares with single variant directives the same
+    variants as variants-bulk.
+    """
+
+    homepage = "http://www.example.com"
+    url = "http://www.example.com/variants-single-1.0.tar.gz"
+
+    version('1.0', '0123456789abcdef0123456789abcdef')
+
+    variant('foo', default=False, description='  Activate foo  ')
+    variant('bar', default='true', description='Activate bar')
+    variant('baz', default='a', description='Choose baz',
+            values=('a', 'b', 'c'))
+    variant('qux', description='Any value for qux')
+    variant('fee', default='a,b', description='Choose many fee',
+            values=('a', 'b', 'c'), multi=True)
+
+    def install(self, spec, prefix):
+        pass
@@ -48,9 +48,8 @@ class Lammps(CMakePackage):
     supported_packages = ['voronoi', 'rigid', 'user-nc-dump', 'kspace',
                           'latte', 'user-atc', 'meam', 'manybody']
 
-    for pkg in supported_packages:
-        variant(pkg, default=False,
-                description='Activate the {0} package'.format(pkg))
+    variants_bulk([(pkg, False, 'Activate the {0} package'.format(pkg))
+                   for pkg in supported_packages])
     variant('lib', default=True,
             description='Build the liblammps in addition to the executable')
     variant('mpi', default=True,
@@ -73,29 +72,25 @@ class Lammps(CMakePackage):
 
     root_cmakelists_dir = 'cmake'
 
+    #: Boolean variants and the CMake flags that mirror them
+    variant_cmake_flags = [
+        ('lib', '-DBUILD_SHARED_LIBS='),
+        ('mpi', '-DENABLE_MPI='),
+        ('rigid', '-DENABLE_RIGID='),
+        ('meam', '-DENABLE_MEAM='),
+        ('kspace', '-DENABLE_KSAPCE='),
+        ('latte', '-DENABLE_LATTE='),
+        ('manybody', '-DENABLE_MANYBODY='),
+        ('user-nc-dump', '-DENABLE_USER-NETCDF='),
+        ('voronoi', '-DENABLE_VORONOI='),
+        ('user-atc', '-DENABLE_USER-ATC='),
+    ]
+
     def cmake_args(self):
-        spec = self.spec
+        active_variants = set(
+            name for name, v in self.spec.variants.items() if v.value is True)
 
-        return [
-            '-DBUILD_SHARED_LIBS={0}'.format(
-                'ON' if '+lib' in spec else 'OFF'),
-            '-DENABLE_MPI={0}'.format(
-                'ON' if '+mpi' in spec else 'OFF'),
-            '-DENABLE_RIGID={0}'.format(
-                'ON' if '+rigid' in spec else 'OFF'),
-            '-DENABLE_MEAM={0}'.format(
-                'ON' if '+meam' in spec else 'OFF'),
-            '-DENABLE_KSAPCE={0}'.format(
-                'ON' if '+kspace' in spec else 'OFF'),
-            '-DFFT=FFTW3',  # doesn't do harm withiout KSPACE
-            '-DENABLE_LATTE={0}'.format(
-                'ON' if '+latte' in spec else 'OFF'),
-            '-DENABLE_MANYBODY={0}'.format(
-                'ON' if '+manybody' in spec else 'OFF'),
-            '-DENABLE_USER-NETCDF={0}'.format(
-                'ON' if '+user-nc-dump' in spec else 'OFF'),
-            '-DENABLE_VORONOI={0}'.format(
-                'ON' if '+voronoi' in spec else 'OFF'),
-            '-DENABLE_USER-ATC={0}'.format(
-                'ON' if '+user-atc' in spec else 'OFF'),
-        ]
+        args = [flag + ('ON' if name in active_variants else 'OFF')
+                for name, flag in self.variant_cmake_flags]
+        args.append('-DFFT=FFTW3')  # doesn't do harm withiout KSPACE
+        return args